@@ -6,18 +6,28 @@
 ###################################################################################
 
 import argparse
-import io
+import hashlib
 import json
+import mmap
 import os
 import re
+import struct
 import subprocess
 import sys
 
 from datetime import datetime
-from copy import deepcopy
 from os.path import isfile, realpath, normpath
 from collections import deque
-from typing import Dict, List, Callable, Optional, Any
+from functools import lru_cache
+from itertools import chain, groupby, product
+from concurrent.futures import Executor, ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Iterable, List, Set, Tuple, Callable, Optional, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ============================================================================
 # Constants
@@ -35,199 +45,846 @@ _KEY_SONAME = 'soname'
 _KEY_SYMBOLS = 'symbols'
 _KEY_TYPE = 'type'
 
+# Symbol types of "weak" symbols
+_WEAK_SYMBOL_TYPES = frozenset('VvWw')
+
+# Symbol types that "nm" prints for undefined symbols
+_UNDEFINED_SYMBOL_TYPES = frozenset('Uvw')
+
+# Cache synchronization
+_CACHE_LOCK = Lock()
+
+# Cache categories that only depend on the file content and that may be stored persistently
+_PERSISTENT_CATEGORIES = frozenset(['imp', 'exp'])
+
+# Maximum number of files per "file" or "nm" invocation
+_BATCH_SIZE = 8
+
+# Environment and pipe buffer size for external tools
+_TOOL_ENVIRONMENT = { 'LC_ALL': 'C.UTF-8', 'LANG': 'C.UTF-8' }
+_PIPE_BUFFER_SIZE = 1 << 20
+
+# Platform flags
+_OPENBSD_COMPAT = sys.platform.startswith('openbsd')
+_LINUX_COMPAT = sys.platform.startswith('linux')
+
+# Regular expressions
+_RE_PLATFORM = re.compile(r'^(linux|(free|open|net)bsd)|sunos', re.A | re.I)
+_RE_ELF = re.compile(rb'^:?\s*ELF(\s|,|$)', re.I)
+_RE_LDD_OPENBSD = re.compile(rb'^\s+([0-9A-Fa-f]+\s+){2}(exe|rlib|dlib|ld\.so)\s+(\d+\s+){3}(.+?)\s*$')
+_RE_LDCONFIG = re.compile(rb'^\s+(\S+)\s+\(([^)]*)\)\s+=>\s+(.+?)\s*$')
+
+# Dynamic loader configuration (Linux only)
+_LDCONFIG_PATHS = ['/sbin/ldconfig', '/usr/sbin/ldconfig']
+_LD_SO_PRELOAD = '/etc/ld.so.preload'
+_LD_SO_CACHE = '/etc/ld.so.cache'
+_LD_SO_CACHE_MAGIC, _LD_SO_CACHE_OLD_MAGIC = b'glibc-ld.so.cache1.1', b'ld.so-1.7.0'
+_LD_SO_CACHE_ENTRY = struct.Struct('=iIIIQ')
+_HWCAP_SUBDIRS = frozenset(['glibc-hwcaps', 'tls', 'haswell', 'xeon_phi', 'avx512_1', os.uname().machine])
+
+# ELF constants
+_ELF_MAGIC = b'\x7fELF'
+_ELF_SHN_UNDEF, _ELF_SHN_LORESERVE, _ELF_SHN_X86_64_LCOMMON, _ELF_SHN_COMMON = 0x0000, 0xFF00, 0xFF02, 0xFFF2
+_ELF_PT_LOAD, _ELF_PT_DYNAMIC, _ELF_PT_INTERP = 1, 2, 3
+_ELF_ET_EXEC, _ELF_ET_DYN = 2, 3
+_ELF_SHT_DYNAMIC, _ELF_SHT_NOBITS, _ELF_SHT_DYNSYM, _ELF_SHT_GNU_HASH = 6, 8, 11, 0x6FFFFFF6
+_ELF_SHT_GNU_VERDEF, _ELF_SHT_GNU_VERNEED, _ELF_SHT_GNU_VERSYM = 0x6FFFFFFD, 0x6FFFFFFE, 0x6FFFFFFF
+_ELF_SHF_WRITE, _ELF_SHF_ALLOC, _ELF_SHF_EXECINSTR = 0x1, 0x2, 0x4
+_ELF_STB_LOCAL, _ELF_STB_GLOBAL, _ELF_STB_WEAK, _ELF_STB_GNU_UNIQUE = 0, 1, 2, 10
+_ELF_STT_OBJECT, _ELF_STT_SECTION, _ELF_STT_FILE, _ELF_STT_COMMON, _ELF_STT_GNU_IFUNC = 1, 3, 4, 5, 10
+_ELF_DT_NULL, _ELF_DT_NEEDED, _ELF_DT_STRTAB, _ELF_DT_STRSZ, _ELF_DT_SONAME, _ELF_DT_RPATH, _ELF_DT_RUNPATH, _ELF_DT_FLAGS_1 = 0, 1, 5, 10, 14, 15, 29, 0x6FFFFFFB
+_ELF_DF_1_NODEFLIB = 0x800
+_ELF_EM_X86_64 = 62
+_ELF_VER_FLG_BASE = 0x1
+_ELF_VERSYM_HIDDEN = 0x8000
+_ELF_ERRORS = (OSError, ValueError, IndexError, struct.error)
+
 # ============================================================================
-# Functions
+# ELF Inspector
 # ============================================================================
 
-def _start_process(args: List[str]) -> subprocess.Popen:
-    return subprocess.Popen(args, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdout=subprocess.PIPE, env={'LC_ALL': 'C.UTF-8', 'LANG': 'C.UTF-8'})
+class _ElfInspector:
+    """Reads the dynamic section and the dynamic symbol table directly from a memory-mapped ELF file"""
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if (self._data[:4] != _ELF_MAGIC) or (self._data[4] not in (1, 2)) or (self._data[5] not in (1, 2)):
+                raise ValueError(f"File \"{filename}\" is not a valid ELF file!")
+            is_64bit, self._order = (self._data[4] == 2), ('<' if self._data[5] == 1 else '>')
+            self._sym_format = struct.Struct(self._order + ('IBBHQQ' if is_64bit else 'IIIBBH'))
+            self._dyn_format = struct.Struct(self._order + ('qQ' if is_64bit else 'iI'))
+            header = struct.unpack_from(self._order + ('HHIQQQIHHHHHH' if is_64bit else 'HHIIIIIHHHHHH'), self._data, 16)
+            self._machine, phoff, phentsize, phnum, shoff, shentsize, shnum = header[1], header[4], header[8], header[9], header[5], header[10], header[11]
+            phdr_format, phdr_fields = struct.Struct(self._order + ('IIQQQQQQ' if is_64bit else 'IIIIIIII')), ((0, 2, 5, 3) if is_64bit else (0, 1, 4, 2))
+            self._segments = []
+            for index in range(phnum if phoff > 0 else 0):
+                phdr = phdr_format.unpack_from(self._data, phoff + (index * phentsize))
+                self._segments.append(tuple(phdr[_field] for _field in phdr_fields))  # (type, offset, file size, virtual address)
+            self.header_id = (self._data[4], self._data[5], self._machine)
+            shdr_format = struct.Struct(self._order + ('IIQQQQIIQQ' if is_64bit else 'IIIIIIIIII'))
+            if (shoff > 0) and (shnum == 0):
+                shnum = shdr_format.unpack_from(self._data, shoff)[5]
+            self._sections = [ shdr_format.unpack_from(self._data, shoff + (index * shentsize)) for index in range(shnum if shoff > 0 else 0) ]
+            self._is_64bit, self._strtabs = is_64bit, {}
+        except BaseException:
+            self._data.close()
+            raise
+
+    def __enter__(self) -> '_ElfInspector':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._data.close()
+
+    @staticmethod
+    def is_elf_file(filename: str) -> bool:
+        with open(filename, 'rb') as file:
+            header = file.read(18)
+        if (len(header) < 18) or (header[:4] != _ELF_MAGIC):
+            return False
+        return int.from_bytes(header[16:18], 'big' if header[5] == 2 else 'little') in (_ELF_ET_EXEC, _ELF_ET_DYN)
+
+    def interpreter(self) -> Optional[str]:
+        for segment_type, offset, size, _ in self._segments:
+            if segment_type == _ELF_PT_INTERP:
+                return os.fsdecode(self._data[offset:offset + size].split(b'\0', 1)[0])
+        return None
+
+    def dynamic(self) -> Optional[Tuple[List[str], Optional[str], Optional[str], Optional[str], int]]:
+        sections = self._find_sections(_ELF_SHT_DYNAMIC)
+        if sections:
+            dynamic_entries, strtab = list(self._dyn_format.iter_unpack(self._section_data(sections[0]))), self._sections[sections[0][6]][4:6]
+        else:
+            dynamic_entries, strtab = self._dynamic_segment()
+            if dynamic_entries is None:
+                return None
+        needed, entries, flags_1 = [], {}, 0
+        for tag, value in dynamic_entries:
+            if tag == _ELF_DT_NULL:
+                break
+            elif tag == _ELF_DT_NEEDED:
+                needed.append(self._string_at(strtab, value))
+            elif tag in (_ELF_DT_SONAME, _ELF_DT_RPATH, _ELF_DT_RUNPATH):
+                entries.setdefault(tag, self._string_at(strtab, value))
+            elif tag == _ELF_DT_FLAGS_1:
+                flags_1 = value
+        runpath = entries.get(_ELF_DT_RUNPATH)
+        return (needed, entries.get(_ELF_DT_SONAME), entries.get(_ELF_DT_RPATH) if runpath is None else None, runpath, flags_1)
+
+    def symbol_tables(self, get_undefined: bool = True, get_defined: bool = True) -> Tuple[Dict[str, str], Dict[str, str]]:
+        undefined_symbols, defined_symbols = {}, {}
+        for section in self._find_sections(_ELF_SHT_DYNSYM):
+            versions = self._symbol_versions(section)
+            for index, entry in enumerate(self._sym_format.iter_unpack(self._section_data(section))):
+                name, info, shndx = (entry[0], entry[1], entry[3]) if self._is_64bit else (entry[0], entry[3], entry[5])
+                binding, type = info >> 4, info & 0xF
+                if (index == 0) or (type == _ELF_STT_SECTION) or (type == _ELF_STT_FILE):
+                    continue
+                symbol_type = self._symbol_type(binding, type, shndx)
+                is_defined = (shndx != _ELF_SHN_UNDEF) and (symbol_type != 'U')
+                if (get_defined if is_defined else get_undefined):
+                    dynamic_symbols = defined_symbols if is_defined else undefined_symbols
+                    symbol_name = self._string(section[6], name)
+                    if not symbol_name:
+                        continue
+                    version, hidden = versions[index] if index < len(versions) else ('', False)
+                    if version and (symbol_name != version):
+                        dynamic_symbols[sys.intern(f"{symbol_name}@{version}")] = symbol_type
+                        if not (hidden or (shndx == _ELF_SHN_UNDEF)):
+                            dynamic_symbols[sys.intern(symbol_name)] = f"~{symbol_type}"
+                    else:
+                        dynamic_symbols[sys.intern(symbol_name)] = symbol_type
+        return (undefined_symbols, defined_symbols)
+
+    def may_define_any(self, names: Iterable[str]) -> bool:
+        # Test the names against the bloom filter of the GNU hash table, which has false positives but no false negatives
+        dynsym = self._find_sections(_ELF_SHT_DYNSYM)
+        gnu_hash = [ section for section in self._find_sections(_ELF_SHT_GNU_HASH) if (len(dynsym) == 1) and (section[6] == self._sections.index(dynsym[0])) ]
+        if (not gnu_hash) or (gnu_hash[0][1] == _ELF_SHT_NOBITS) or (gnu_hash[0][5] < 16):
+            return True
+        _, symoffset, bloom_size, bloom_shift = struct.unpack_from(self._order + 'IIII', self._data, gnu_hash[0][4])
+        word_bits = 64 if self._is_64bit else 32
+        if (bloom_size == 0) or (gnu_hash[0][5] < 16 + (bloom_size * word_bits // 8)):
+            return True
+        for entry in self._sym_format.iter_unpack(self._section_data(dynsym[0])[self._sym_format.size:self._sym_format.size * symoffset]):
+            info, shndx = (entry[1], entry[3]) if self._is_64bit else (entry[3], entry[5])
+            if (shndx != _ELF_SHN_UNDEF) and ((info & 0xF) not in (_ELF_STT_SECTION, _ELF_STT_FILE)):
+                return True  # defined symbols that are not hashed (e.g. local ones)
+        bloom = struct.unpack_from(f"{self._order}{bloom_size}{'Q' if self._is_64bit else 'I'}", self._data, gnu_hash[0][4] + 16)
+        for name in names:
+            for symbol_name in ({ name, name.rpartition('@')[0] } if '@' in name else (name,)):
+                hash_value = _gnu_hash(symbol_name)
+                if hash_value is None:
+                    return True
+                word = bloom[(hash_value // word_bits) % bloom_size]
+                if (word >> (hash_value % word_bits)) & (word >> ((hash_value >> bloom_shift) % word_bits)) & 1:
+                    return True
+        return False
+
+    def _find_sections(self, section_type: int) -> List[Tuple]:
+        return [ section for section in self._sections if section[1] == section_type ]
+
+    def _section_data(self, section: Tuple) -> bytes:
+        if section[1] == _ELF_SHT_NOBITS:
+            return b''
+        entsize = section[9] if section[9] > 0 else (self._dyn_format.size if section[1] == _ELF_SHT_DYNAMIC else self._sym_format.size)
+        return self._data[section[4]:section[4] + section[5] - (section[5] % entsize)]
+
+    def _dynamic_segment(self) -> Tuple[Optional[List[Tuple[int, int]]], Tuple[int, int]]:
+        segment = next((_segment for _segment in self._segments if _segment[0] == _ELF_PT_DYNAMIC), None)
+        if segment is None:
+            return (None, (0, 0))
+        dynamic_entries = list(self._dyn_format.iter_unpack(self._data[segment[1]:segment[1] + segment[2] - (segment[2] % self._dyn_format.size)]))
+        strtab_addr, strtab_size = next((_value for _tag, _value in dynamic_entries if _tag == _ELF_DT_STRTAB), None), next((_value for _tag, _value in dynamic_entries if _tag == _ELF_DT_STRSZ), 0)
+        strtab_offset = self._file_offset(strtab_addr) if strtab_addr is not None else None
+        if strtab_offset is None:
+            raise ValueError("Dynamic string table not found!")
+        return (dynamic_entries, (strtab_offset, strtab_size))
+
+    def _file_offset(self, address: int) -> Optional[int]:
+        for segment_type, offset, size, vaddr in self._segments:
+            if (segment_type == _ELF_PT_LOAD) and (vaddr <= address < vaddr + size):
+                return offset + (address - vaddr)
+        return None
+
+    def _string(self, strtab_index: int, offset: int) -> str:
+        return self._string_at(self._sections[strtab_index][4:6], offset)
+
+    def _string_at(self, strtab: Tuple[int, int], offset: int) -> str:
+        text = self._strtabs.get(strtab)
+        if text is None:
+            data = self._data[strtab[0]:strtab[0] + strtab[1]]
+            text = self._strtabs[strtab] = data.decode('ascii') if data.isascii() else False
+        if text is False:
+            start = strtab[0] + offset
+            end = self._data.find(b'\0', start, strtab[0] + strtab[1])
+            return self._data[start:end if end >= 0 else start].decode('utf-8', errors='replace')
+        end = text.find('\0', offset)
+        return text[offset:end if end >= 0 else offset]
+
+    def _symbol_type(self, binding: int, type: int, shndx: int) -> str:
+        if (shndx == _ELF_SHN_COMMON) or ((shndx == _ELF_SHN_X86_64_LCOMMON) and (self._machine == _ELF_EM_X86_64)):
+            return 'C'
+        if shndx == _ELF_SHN_UNDEF:
+            return ('v' if type in (_ELF_STT_OBJECT, _ELF_STT_COMMON) else 'w') if binding == _ELF_STB_WEAK else 'U'
+        if type == _ELF_STT_GNU_IFUNC:
+            return 'i'
+        if binding == _ELF_STB_WEAK:
+            return 'V' if type in (_ELF_STT_OBJECT, _ELF_STT_COMMON) else 'W'
+        if binding == _ELF_STB_GNU_UNIQUE:
+            return 'u'
+        if binding not in (_ELF_STB_LOCAL, _ELF_STB_GLOBAL):
+            return '?'
+        if (shndx >= _ELF_SHN_LORESERVE) or (shndx >= len(self._sections)):
+            type_char = 'a'
+        else:
+            _, section_type, flags = self._sections[shndx][:3]
+            if flags & _ELF_SHF_EXECINSTR:
+                type_char = 't'
+            elif (flags & _ELF_SHF_ALLOC) and (section_type != _ELF_SHT_NOBITS):
+                type_char = 'd' if flags & _ELF_SHF_WRITE else 'r'
+            elif section_type == _ELF_SHT_NOBITS:
+                type_char = 'b'
+            else:
+                type_char = '?' if flags & _ELF_SHF_WRITE else 'n'
+        return type_char.upper() if binding == _ELF_STB_GLOBAL else type_char
+
+    def _symbol_versions(self, dynsym: Tuple) -> List[Tuple[str, bool]]:
+        versym = [ section for section in self._find_sections(_ELF_SHT_GNU_VERSYM) if section[6] == self._sections.index(dynsym) ]
+        verdef, verneed = self._find_sections(_ELF_SHT_GNU_VERDEF), self._find_sections(_ELF_SHT_GNU_VERNEED)
+        if not (versym and (verdef or verneed)):
+            return []
+        definitions, requirements = {}, {}
+        for section in verdef:
+            offset = section[4]
+            for _ in range(section[7]):
+                _, flags, ndx, count, _, aux, next = struct.unpack_from(self._order + 'HHHHIII', self._data, offset)
+                definitions[ndx & 0x7FFF] = (flags, self._string(section[6], struct.unpack_from(self._order + 'I', self._data, offset + aux)[0]) if count > 0 else None)
+                if next == 0:
+                    break
+                offset += next
+        for section in verneed:
+            offset = section[4]
+            for _ in range(section[7]):
+                _, count, _, aux, next = struct.unpack_from(self._order + 'HHIII', self._data, offset)
+                aux_offset = offset + aux
+                for _ in range(count):
+                    _, _, other, name, aux_next = struct.unpack_from(self._order + 'IHHII', self._data, aux_offset)
+                    requirements.setdefault(other, self._string(section[6], name))
+                    if aux_next == 0:
+                        break
+                    aux_offset += aux_next
+                if next == 0:
+                    break
+                offset += next
+        entries, max_definition = struct.unpack_from(f"{self._order}{versym[0][5] // 2}H", self._data, versym[0][4]), max(definitions, default=0)
+        decoded = {}
+        for entry in set(entries):
+            number, hidden = entry & 0x7FFF, (entry & _ELF_VERSYM_HIDDEN) != 0
+            if (number == 0) or ((number == 1) and ((number > max_definition) or (definitions.get(1, (0,))[0] == _ELF_VER_FLG_BASE))):
+                decoded[entry] = ('', hidden)
+            elif number <= max_definition:
+                decoded[entry] = (definitions.get(number, (0, None))[1] or '', hidden)
+            else:
+                decoded[entry] = (requirements.get(number, '<corrupt>'), True)
+        return [ decoded[entry] for entry in entries ]
+
+class _SharedObject:
+    """An ELF file in the simulated load order of the dynamic loader"""
+
+    def __init__(self, path: str, libname: str, dynamic: Optional[Tuple], loader: Optional['_SharedObject']):
+        self.path, self.real, self.libname, self.loader, self.names = path, _real_path(path), libname, loader, { path, libname }
+        self.needed, self.soname, self.rpath, self.runpath, self.flags_1 = dynamic if dynamic else ([], None, None, None, 0)
+        self.origin = os.path.dirname(path if path.startswith('/') else os.path.join(os.getcwd(), path))
 
-def _lazy_compute(cache: Dict, category: str, key: str, factory: Callable[[str], Any]) -> Any:
-    cache_entry = json.dumps({ 'category': category, 'name': key }, sort_keys=True, separators=(',', ':'))
-    value = cache.get(cache_entry, NotImplemented)
-    return deepcopy(value if value is not NotImplemented else cache.setdefault(cache_entry, factory(key)))
+# ============================================================================
+# Functions
+# ============================================================================
+
+def _run_capture(args: List[str]) -> Tuple[List[bytes], int]:
+    completed = subprocess.run(args, bufsize=_PIPE_BUFFER_SIZE, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdout=subprocess.PIPE, env=_TOOL_ENVIRONMENT, close_fds=False, check=False)
+    return completed.stdout.splitlines(), completed.returncode
+
+def _lazy_compute(cache: Dict[Tuple[str, Any], Any], category: str, key: Any, factory: Callable[[Any], Any]) -> Any:
+    cache_entry = (category, key)
+    with _CACHE_LOCK:
+        value = cache.get(cache_entry, NotImplemented)
+    if value is NotImplemented:
+        value = _load_cache_entry(cache, category, key)
+        if value is NotImplemented:
+            value = factory(key)
+        with _CACHE_LOCK:
+            value = cache.setdefault(cache_entry, value)
+    return value
+
+def _lazy_compute_all(cache: Dict[Tuple[str, str], Any], category: str, keys: List[str], factory: Callable[[List[str]], Dict[str, Any]]) -> List[Any]:
+    with _CACHE_LOCK:
+        values = [ cache.get((category, key), NotImplemented) for key in keys ]
+    missing = list(dict.fromkeys(key for key, value in zip(keys, values) if value is NotImplemented))
+    if missing:
+        computed = { key: _load_cache_entry(cache, category, key) for key in missing }
+        remaining = [ key for key, value in computed.items() if value is NotImplemented ]
+        if remaining:
+            computed.update(factory(remaining))
+        with _CACHE_LOCK:
+            for key in missing:
+                cache.setdefault((category, key), computed[key])
+            values = [ cache[(category, key)] for key in keys ]
+    return values
+
+def _split_batches(items: List[Any]) -> List[List[Any]]:
+    return [ items[_pos:_pos + _BATCH_SIZE] for _pos in range(0, len(items), _BATCH_SIZE) ]
+
+def _canonical_path(cache: Dict[Tuple[str, str], Any], filename: str) -> str:
+    return _lazy_compute(cache, 'path', filename, lambda _key: _real_path(normpath(_key)))
+
+@lru_cache(maxsize=8192)
+def _real_path(path: str) -> str:
+    return realpath(path)
+
+@lru_cache(maxsize=65536)
+def _gnu_hash(name: str) -> Optional[int]:
+    if '\ufffd' in name:
+        return None  # the original bytes of the name are unknown
+    hash_value = 5381
+    for char in name.encode('utf-8'):
+        hash_value = ((hash_value * 33) + char) & 0xFFFFFFFF
+    return hash_value
+
+def _parallel_map(executor: Optional[Executor], function: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+    return list(executor.map(function, items) if executor else map(function, items))
 
 def _merge_dict(first: Optional[dict], second: Optional[dict]) -> dict:
-    merged = deepcopy(first) if first is not None else {}
+    merged = dict(first) if first is not None else {}
     if second is not None:
-        merged.update({ _key: _value for _key, _value in second.items() if _key not in merged })
+        for _key, _value in second.items():
+            merged.setdefault(_key, _value)
     return merged
 
 def _is_weak_symbol(symbol_type: str) -> bool:
-    return (len(symbol_type) > 0) and ("VvWw".find(symbol_type[-1]) >= 0)
+    return symbol_type[-1:] in _WEAK_SYMBOL_TYPES
+
+def _classify_symbols(symbols: Dict[str, str]) -> Tuple[frozenset, frozenset, frozenset]:
+    strong, weak, alias = [], [], []
+    for name, symbol_type in symbols.items():
+        (alias if symbol_type.startswith('~') else weak if _is_weak_symbol(symbol_type) else strong).append(name)
+    return (frozenset(strong), frozenset(weak), frozenset(alias))
 
 # ~~~~~~~~~~~~~~~~~~~~~~
 # Detect executable file
 # ~~~~~~~~~~~~~~~~~~~~~~
 
-def _detect_executable(filename: str) -> bool:
-    is_executable = False
-    regex = re.compile(r'^([^:]+:)?\s*ELF(\s|,|$)', re.I)
+def _detect_executable_file(filenames: List[str]) -> Dict[str, bool]:
+    is_executable = { filename: False for filename in filenames }
     try:
-        with _start_process(['/usr/bin/file', filename]) as proc:
-            for line in io.TextIOWrapper(proc.stdout, encoding="utf-8"):
-                match = regex.search(line)
-                if match:
-                    is_executable = True
-            proc.wait()
+        output, _ = _run_capture(['/usr/bin/file', '--print0', '--'] + filenames)
+        for line in output:
+            filename, _, description = line.partition(b'\0')
+            filename = os.fsdecode(filename)
+            if (filename in is_executable) and _RE_ELF.match(description):
+                is_executable[filename] = True
     except OSError:
         raise ValueError("Failed to execute \"file\" program!")
     return is_executable
 
+def _detect_executable(filenames: List[str]) -> Dict[str, bool]:
+    is_executable = {}
+    for filename in filenames:
+        try:
+            is_executable[filename] = _ElfInspector.is_elf_file(filename)
+        except OSError:
+            is_executable[filename] = False  # unreadable files are reported by the caller
+    return is_executable
+
 # ~~~~~~~~~~~~~~~~~~~~~~~
 # Detect all dependencies
 # ~~~~~~~~~~~~~~~~~~~~~~~
 
+@lru_cache(maxsize=None)
+def _read_library_cache() -> Optional[Dict[str, List[Tuple[str, bool]]]]:
+    if (not _LINUX_COMPAT) or os.path.exists(_LD_SO_PRELOAD):
+        return None
+    try:
+        with open(_LD_SO_CACHE, 'rb') as file:
+            library_cache = _parse_library_cache(file.read())
+        if library_cache is not None:
+            return library_cache
+    except _ELF_ERRORS:
+        pass
+    return _read_library_cache_ldconfig()
+
+def _parse_library_cache(data: bytes) -> Optional[Dict[str, List[Tuple[str, bool]]]]:
+    start = ((16 + (struct.unpack_from('=I', data, 12)[0] * 12) + 7) & ~7) if data.startswith(_LD_SO_CACHE_OLD_MAGIC) else 0
+    if data[start:start + len(_LD_SO_CACHE_MAGIC)] != _LD_SO_CACHE_MAGIC:
+        return None
+    library_cache = {}
+    for index in range(struct.unpack_from('=I', data, start + 20)[0]):
+        _, key, value, _, hwcap = _LD_SO_CACHE_ENTRY.unpack_from(data, start + 48 + (index * _LD_SO_CACHE_ENTRY.size))
+        name, path = (data[start + _offset:data.index(b'\0', start + _offset)] for _offset in (key, value))
+        library_cache.setdefault(os.fsdecode(name), []).append((os.fsdecode(path), hwcap != 0))
+    return library_cache
+
+def _read_library_cache_ldconfig() -> Optional[Dict[str, List[Tuple[str, bool]]]]:
+    ldconfig = next((path for path in _LDCONFIG_PATHS if os.access(path, os.X_OK)), None)
+    if not ldconfig:
+        return None
+    library_cache = {}
+    try:
+        output, exit_code = _run_capture([ldconfig, '-p'])
+        for line in output:
+            match = _RE_LDCONFIG.match(line)
+            if match:
+                library_cache.setdefault(os.fsdecode(match.group(1)), []).append((os.fsdecode(match.group(3)), b'hwcap' in match.group(2)))
+        if exit_code != 0:
+            return None
+    except OSError:
+        return None
+    return library_cache
+
+@lru_cache(maxsize=None)
+def _default_interpreter(header_id: Tuple[int, int, int]) -> Optional[str]:
+    for filename in ['/bin/sh', sys.executable]:
+        try:
+            with _ElfInspector(filename) as inspector:
+                if inspector.header_id == header_id:
+                    return inspector.interpreter()
+        except _ELF_ERRORS:
+            pass
+    return None
+
+@lru_cache(maxsize=None)
+def _has_hwcap_subdirs(directory: str) -> bool:
+    return any(os.path.isdir(os.path.join(directory, name)) for name in _HWCAP_SUBDIRS)
+
+@lru_cache(maxsize=None)
+def _is_compatible(filename: str, header_id: Tuple[int, int, int]) -> bool:
+    try:
+        with _ElfInspector(filename) as inspector:
+            return inspector.header_id == header_id
+    except _ELF_ERRORS:
+        return False
+
+@lru_cache(maxsize=None)
+def _read_dynamic(filename: str) -> Optional[Tuple]:
+    with _ElfInspector(filename) as inspector:
+        return inspector.dynamic()
+
+def _expand_search_path(search_path: str, origin: str) -> Optional[List[str]]:
+    directories = []
+    for directory in search_path.split(':'):
+        directory = directory.replace('${ORIGIN}', origin).replace('$ORIGIN', origin)
+        if '$' in directory:
+            return None
+        directories.append(directory if directory else '.')
+    return directories
+
+def _search_library(name: str, requester: _SharedObject, header_id: Tuple[int, int, int], library_cache: Dict[str, List[Tuple[str, bool]]]) -> Optional[str]:
+    directories, current = [], requester
+    if requester.runpath is None:
+        while current:
+            expanded = _expand_search_path(current.rpath, current.origin) if current.rpath else []
+            if expanded is None:
+                return None
+            directories += expanded
+            current = current.loader
+    else:
+        directories = _expand_search_path(requester.runpath, requester.origin)
+        if directories is None:
+            return None
+    for directory in directories:
+        if _has_hwcap_subdirs(directory):
+            return None
+        candidate = os.path.join(directory, name)
+        if isfile(candidate) and _is_compatible(candidate, header_id):
+            return candidate
+    if not (requester.flags_1 & _ELF_DF_1_NODEFLIB):
+        entries = library_cache.get(name, [])
+        if not any(has_hwcap for _, has_hwcap in entries):
+            return next((path for path, _ in entries if _is_compatible(path, header_id)), None)
+    return None
+
+def _detect_dependencies_elf(filename: str) -> Optional[Dict[str, str]]:
+    library_cache = _read_library_cache()
+    if library_cache is None:
+        return None
+    with _ElfInspector(filename) as inspector:
+        header_id, interpreter, dynamic = inspector.header_id, inspector.interpreter(), inspector.dynamic()
+    interpreter = interpreter or _default_interpreter(header_id)
+    if (dynamic is None) or (not interpreter):
+        return None
+    rtld = _SharedObject(interpreter, interpreter, _read_dynamic(interpreter), None)
+    main_object = _SharedObject(filename, filename, dynamic, None)
+    if (main_object.real == rtld.real) or (not main_object.needed):
+        return {}
+    loaded, search_list = [main_object, rtld], [main_object]
+    for current in search_list:
+        for name in current.needed:
+            found = next((_object for _object in loaded if (name in _object.names) or (name == _object.soname)), None)
+            if found is None:
+                path = _search_library(name, current, header_id, library_cache) if '/' not in name else None
+                if path is None:
+                    return None
+                found = next((_object for _object in loaded if _object.real == _real_path(path)), None)
+                if found is None:
+                    found = _SharedObject(path, name, _read_dynamic(path), current)
+                    loaded.append(found)
+                else:
+                    found.names.add(name)
+            if found not in search_list:
+                search_list.append(found)
+    return { (_object.libname.rpartition('/')[2] if _object.libname == _object.path else _object.libname): _real_path(normpath(_object.path)) for _object in search_list[1:] }
+
 def _detect_dependencies(filename: str) -> Dict[str, str]:
-    dependencies, openbsd_compat = {}, sys.platform.startswith('openbsd')
-    regex = re.compile(
-        r'^\s+([0-9A-Fa-f]+\s+){2}(exe|rlib|dlib|ld\.so)\s+(\d+\s+){3}(.+?)\s*$' if openbsd_compat else
-        r'^\s+([^<>]+?)(\s+=>\s+(.*?))??(\s*\(0x[0-9A-Fa-f]+\))?\s*$')
     try:
-        with _start_process(['/usr/bin/ldd', filename]) as proc:
-            for line in io.TextIOWrapper(proc.stdout, encoding="utf-8"):
-                match = regex.search(line)
-                if match:
-                    if openbsd_compat:
-                        type, library = match.group(2), match.group(4)
-                        if type != "exe":
-                            basename = os.path.basename(library)
-                            dependencies[basename] = realpath(normpath(library))
-                    else:
-                        library, path = match.group(1), match.group(3)
-                        if path:
-                            if path != "not found":
-                                dependencies[library] = realpath(normpath(path))
-                        elif library.startswith("/"):
-                            basename = os.path.basename(library)
-                            dependencies[basename] = realpath(normpath(library))
-            error_code = proc.wait()
-            if error_code != 0:
-                raise ValueError(f"Failed to detect dependencies! (error code: {error_code})")
+        dependencies = _detect_dependencies_elf(filename)
+    except _ELF_ERRORS:
+        dependencies = None
+    if (dependencies is None) and _LINUX_COMPAT:
+        dependencies = _detect_dependencies_rtld(filename)
+    return dependencies if dependencies is not None else _detect_dependencies_ldd(filename)
+
+def _detect_dependencies_rtld(filename: str) -> Optional[Dict[str, str]]:
+    try:
+        with _ElfInspector(filename) as inspector:
+            interpreter = _default_interpreter(inspector.header_id)
+        if interpreter:
+            output, error_code = _run_capture([interpreter, '--list', filename])
+            if error_code == 0:
+                return _parse_ldd_output(output)
+    except _ELF_ERRORS:
+        pass
+    return None
+
+def _detect_dependencies_ldd(filename: str) -> Dict[str, str]:
+    try:
+        output, error_code = _run_capture(['/usr/bin/ldd', filename])
+        if error_code != 0:
+            raise ValueError(f"Failed to detect dependencies! (error code: {error_code})")
     except OSError:
         raise ValueError("Failed to execute \"ldd\" program!")
+    return _parse_ldd_output(output)
+
+def _parse_ldd_output(output: List[bytes]) -> Dict[str, str]:
+    dependencies = {}
+    for line in output:
+        if _OPENBSD_COMPAT:
+            match = _RE_LDD_OPENBSD.match(line)
+            if match and (match.group(2) != b"exe"):
+                library = os.fsdecode(match.group(4))
+                dependencies[library.rpartition('/')[2]] = _real_path(normpath(library))
+            continue
+        if not line[:1].isspace():
+            continue
+        entry = line.strip()
+        if entry.endswith(b')'):
+            head, separator, _ = entry.rpartition(b' (0x')
+            entry = head.rstrip() if separator else entry
+        library, separator, path = entry.partition(b' => ')
+        if (not library) or (b'<' in library) or (b'>' in library):
+            continue
+        library, path = os.fsdecode(library.rstrip()), separator and os.fsdecode(path.strip())
+        if path:
+            if path != "not found":
+                dependencies[library] = _real_path(normpath(path))
+        elif library.startswith("/"):
+            dependencies[library.rpartition('/')[2]] = _real_path(normpath(library))
     return dependencies
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Detect all imported/exported symbols
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-def _detect_symbols(filename: str, get_defined: bool) -> Dict[str, str]:
-    dynamic_symbols = {}
-    regex_line = re.compile(r'^\s*([0-9a-fA-F]+\s+)?([A-Za-z])\s+([^\s]+)\s*$')
-    regex_zero = re.compile(r'^0+$')
-    regex_name = re.compile(r'([^@\s]+)@@([^@\s]+)')
+def _detect_symbols_nm(filenames: List[str], get_undefined: bool, get_defined: bool) -> Dict[str, Tuple[Dict[str, str], Dict[str, str]]]:
+    all_symbols = { filename: ({}, {}) for filename in filenames }
+    headers = { os.fsencode(filename) + b':': all_symbols[filename] for filename in filenames } if len(filenames) > 1 else {}
+    symbol_tables = all_symbols[filenames[0]] if len(filenames) == 1 else None
     try:
-        with _start_process(['/usr/bin/nm', '-D', '-p', filename]) as proc:
-            for line in io.TextIOWrapper(proc.stdout, encoding="utf-8"):
-                match = regex_line.search(line)
-                if match:
-                    address, symbol_type, symbol_name = match.group(1), match.group(2), match.group(3)
-                    is_defined = address and (not regex_zero.search(address)) and (symbol_type != 'U')
-                    if (is_defined if get_defined else (not is_defined)):
-                        match = regex_name.search(symbol_name)
-                        if match:
-                            dynamic_symbols[f"{match.group(1)}@{match.group(2)}"] = symbol_type
-                            dynamic_symbols[match.group(1)] = f"~{symbol_type}"
-                        else:
-                            dynamic_symbols[symbol_name] = symbol_type
-            error_code = proc.wait()
-            if error_code != 0:
-                raise ValueError(f"Failed to read symbol table! (error code: {error_code})")
+        output, error_code = _run_capture(['/usr/bin/nm', '-D', '-p', '--format=posix'] + ([] if get_undefined and get_defined else ['--defined-only' if get_defined else '--undefined-only']) + ['--'] + filenames)
+        for line in output:
+            if line.endswith(b':') and (line in headers):
+                symbol_tables = headers[line]
+                continue
+            fields = line.split(None, 2)
+            if (len(fields) < 2) or (symbol_tables is None):
+                continue
+            symbol_name, symbol_type = fields[0], fields[1]
+            if (len(symbol_type) == 1) and symbol_type.isalpha():
+                symbol_type = symbol_type.decode('ascii')
+                dynamic_symbols = symbol_tables[0 if symbol_type in _UNDEFINED_SYMBOL_TYPES else 1]
+                name, separator, version = symbol_name.partition(b'@@')
+                if separator and name and version:
+                    name, version = name.decode('utf-8', errors='replace'), version.decode('utf-8', errors='replace')
+                    dynamic_symbols[sys.intern(f"{name}@{version}")] = symbol_type
+                    dynamic_symbols[sys.intern(name)] = f"~{symbol_type}"
+                else:
+                    dynamic_symbols[sys.intern(symbol_name.decode('utf-8', errors='replace'))] = symbol_type
+        if error_code != 0:
+            raise ValueError(f"Failed to read symbol table! (error code: {error_code})")
     except OSError:
         raise ValueError("Failed to execute \"nm\" program!")
-    return dynamic_symbols
+    return all_symbols
+
+def _detect_symbol_tables(filenames: List[str], get_undefined: bool = True, get_defined: bool = True) -> Dict[str, Tuple[Dict[str, str], Dict[str, str]]]:
+    all_symbols, fallback = {}, []
+    for filename in filenames:
+        try:
+            with _ElfInspector(filename) as inspector:
+                all_symbols[filename] = inspector.symbol_tables(get_undefined, get_defined)
+        except _ELF_ERRORS:
+            fallback.append(filename)
+    if fallback:
+        all_symbols.update(_detect_symbols_nm(fallback, get_undefined, get_defined))
+    return all_symbols
+
+def _detect_symbols(filenames: List[str], get_defined: bool) -> Dict[str, Dict[str, str]]:
+    return { filename: tables[1 if get_defined else 0] for filename, tables in _detect_symbol_tables(filenames, not get_defined, get_defined).items() }
+
+def _may_export_any(filename: str, names: Set[str]) -> bool:
+    try:
+        with _ElfInspector(filename) as inspector:
+            return inspector.may_define_any(names)
+    except _ELF_ERRORS:
+        return True
+
+def _detect_exports(cache: Dict[Tuple[str, str], Any], filenames: List[str], keep_imports: bool) -> Dict[str, Dict[str, str]]:
+    if not keep_imports:
+        return _detect_symbols(filenames, True)
+    all_symbols = _detect_symbol_tables(filenames)
+    with _CACHE_LOCK:
+        for filename, (imported, _) in all_symbols.items():
+            cache.setdefault(('imp', filename), imported)  # the library is going to be processed as a file later
+    return { filename: exported for filename, (_, exported) in all_symbols.items() }
+
+def _detect_missing_exports(cache: Dict[Tuple[str, str], Any], filenames: List[str], missing: Set[str], keep_imports: bool) -> List[Dict[str, str]]:
+    with _CACHE_LOCK:
+        cached = [ ('exp', filename) in cache for filename in filenames ]
+    required = [ filename for filename, is_cached in zip(filenames, cached) if is_cached or _may_export_any(filename, missing) ]
+    exported = dict(zip(required, _lazy_compute_all(cache, 'exp', required, lambda _keys: _detect_exports(cache, _keys, keep_imports))))
+    return [ exported.get(filename, {}) for filename in filenames ]  # skipped libraries can not export any of the missing symbols
+
+# ~~~~~~~~~~~~~~~~
+# Persistent cache
+# ~~~~~~~~~~~~~~~~
+
+def _file_stamp(filename: str) -> Optional[Tuple[int, int]]:
+    try:
+        status = os.stat(filename)
+        return (status.st_mtime_ns, status.st_size)
+    except OSError:
+        return None
+
+class _PersistentCache(dict):
+    """In-memory cache that keeps the persistent categories in a directory, as one file per entry that is replaced when the file changes"""
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory, self._loaded, self._stamps = directory, set(), {}
+
+    def load(self, category: str, filename: str) -> Any:
+        # The stamp is taken before the entry is loaded or computed, so that a file that is replaced later can not be saved with a newer stamp
+        stamp = _file_stamp(filename)
+        with _CACHE_LOCK:
+            stamp = self._stamps.setdefault(filename, stamp)
+        if not stamp:
+            return NotImplemented
+        try:
+            with open(self._entry_file(category, filename), 'r', encoding='utf-8') as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return NotImplemented
+        if not (isinstance(content, dict) and (content.get('version') == list(_VERSION)) and (content.get('stamp') == list(stamp)) and isinstance(content.get('value'), dict)):
+            return NotImplemented
+        with _CACHE_LOCK:
+            self._loaded.add((category, filename))
+        return content['value']
+
+    def save(self) -> None:
+        with _CACHE_LOCK:
+            entries = [ (_entry, _value) for _entry, _value in self.items() if (_entry[0] in _PERSISTENT_CATEGORIES) and (_entry not in self._loaded) ]
+        for (category, filename), value in entries:
+            stamp = self._stamps.get(filename)
+            if stamp and (_file_stamp(filename) == stamp):
+                entry_file = self._entry_file(category, filename)
+                temp_file = f"{entry_file}.{os.getpid()}.tmp"
+                try:
+                    os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+                    with open(temp_file, 'w', encoding='utf-8') as file:
+                        json.dump({ 'version': _VERSION, 'stamp': stamp, 'value': value }, file, separators=(',', ':'))
+                    os.replace(temp_file, entry_file)
+                except OSError as e:
+                    print(f"Warning: Failed to write cache file \"{entry_file}\": {e.strerror}", file=sys.stderr)
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+                    return
+                self._loaded.add((category, filename))
+
+    def _entry_file(self, category: str, filename: str) -> str:
+        digest = hashlib.sha1(repr((category, filename)).encode('utf-8', errors='surrogateescape')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+def _load_cache_entry(cache: Dict[Tuple[str, str], Any], category: str, filename: Any) -> Any:
+    if isinstance(cache, _PersistentCache) and (category in _PERSISTENT_CATEGORIES):
+        return cache.load(category, filename)
+    return NotImplemented
+
+def _default_cache_dir() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'dependencies.py')
 
 # ============================================================================
 # Process File
 # ============================================================================
 
-def process_file_recursive(filename: str, ignore_weak: bool, cache: Dict[str, Any] = {}, preloaded: Optional[Dict[str, str]] = None) -> Optional[List[Dict]]:
+def process_file_recursive(filename: str, ignore_weak: bool, cache: Dict[Tuple[str, str], Any] = {}, preloaded: Optional[Dict[str, str]] = None, executor: Optional[Executor] = None, keep_imports: bool = False) -> Optional[List[Dict]]:
     # Detect dependencies
     dependencies = _merge_dict(preloaded, _lazy_compute(cache, 'dep', filename, lambda _key: _detect_dependencies(_key)))
-
-    # Detect imported symbols
-    imported = _lazy_compute(cache, 'imp', filename, lambda _key: _detect_symbols(_key, False))
+    for path in dependencies.values():
+        if not (isfile(path) and os.access(path, os.R_OK)):
+            raise ValueError(f"Required library \"{path}\" not found or access denied!")
+
+    # Detect imported symbols and exported symbols of the first batch of libraries (concurrently)
+    paths = list(dependencies.values())
+    batches = _split_batches(paths)
+    detected = _parallel_map(executor, lambda _task: _task(), [ lambda: _lazy_compute(cache, 'imp', filename, lambda _key: _detect_symbols([_key], False)[_key]) ] + [
+        lambda _batch=_batch: _lazy_compute_all(cache, 'exp', _batch, lambda _keys: _detect_exports(cache, _keys, keep_imports)) for _batch in batches[:1] ])
+    imported = detected[0]
     if len(imported) < 1:
         return None
-
-    # Detect exported symbols of each library
-    exported = {}
-    for library in dependencies:
-        filename = dependencies[library]
-        if not (isfile(filename) and os.access(filename, os.R_OK)):
-            raise ValueError(f"Required library \"{filename}\" not found or access denied!")
-        exported[library] = _lazy_compute(cache, 'exp', filename, lambda _key: _detect_symbols(_key, True))
-
-    # Initialize buffers
-    library_resolved, already_found = {}, set()
-    for library in dependencies:
-        library_resolved[library] = []
-
-    # Determine which symbols are imported from each library
-    for stage in range(3):
-        for library in dependencies:
-            _library_resolved = library_resolved[library]
-            _exported = exported[library]
-            for symbol in [ name for name in _exported if (name not in already_found) and (name in imported) ]:
-                type = _exported[symbol]
-                if (stage > 1) or (not type.startswith('~')):
-                    if (stage > 0) or (not _is_weak_symbol(type)):
-                        _library_resolved.append({ _KEY_NAME: symbol, _KEY_TYPE: type[-1] })
-                        already_found.add(symbol)
-        if not any(symbol not in already_found for symbol in imported):
-            break
-
-    # Build the result data
+    exported_tables = list(chain.from_iterable(detected[1:]))
+
+    # Detect exported symbols of the remaining libraries (concurrently), skipping those that can not provide a missing strong candidate
+    strong_missing = set(imported)
+    for path, symbols in zip(paths, exported_tables):
+        if symbols:
+            strong_missing -= _lazy_compute(cache, 'cls', path, lambda _key: _classify_symbols(symbols))[0]
+    exported_tables += chain.from_iterable(_parallel_map(executor, lambda _batch: _detect_missing_exports(cache, _batch, strong_missing, keep_imports), batches[1:]))
+    exported = dict(zip(dependencies, exported_tables))
+
+    # Determine the best candidate for each symbol (strong > weak > unversioned alias, then library order)
+    candidates = [ library for library in exported if not imported.keys().isdisjoint(exported[library]) ]
+    classified = { library: _lazy_compute(cache, 'cls', dependencies[library], lambda _key: _classify_symbols(exported[library])) for library in candidates }
+    resolved, pending = _resolve_symbols(imported, [ (classified[library], exported[library]) for library in candidates ])
+
+    # Build the result data (grouped by library)
     result_list = []
-    for library in dependencies:
-        _library_resolved = library_resolved[library]
-        if len(_library_resolved) > 0:
-            result_list.append({ _KEY_SONAME: library, _KEY_PATH: dependencies[library], _KEY_SYMBOLS: sorted(_library_resolved, key=lambda sym: sym[_KEY_NAME]) })
+    for index, symbols in groupby(resolved, key=lambda _entry: _entry[0]):
+        library = candidates[index]
+        result_list.append({ _KEY_SONAME: library, _KEY_PATH: dependencies[library], _KEY_SYMBOLS: [ (symbol, type) for _, symbol, type in symbols ] })
 
     # Check for unresolved symbols
-    unresolved = [ { _KEY_NAME: name, _KEY_TYPE: imported[name]} for name in imported if name not in already_found ]
+    unresolved = [ (name, imported[name]) for name in sorted(pending) ]
     if ignore_weak:
-        unresolved = [ symbol for symbol in unresolved if not _is_weak_symbol(symbol[_KEY_TYPE]) ]
+        unresolved = [ symbol for symbol in unresolved if not _is_weak_symbol(symbol[1]) ]
     if len(unresolved) > 0:
-        result_list.append({ _KEY_SONAME: None, _KEY_SYMBOLS: sorted(unresolved, key=lambda sym: sym[_KEY_NAME]) })
+        result_list.append({ _KEY_SONAME: None, _KEY_SYMBOLS: unresolved })
 
     return result_list
 
-def process_file(filename: str, cache: Dict[str, Any] = {}, recursive: bool = False, print_types: bool = False, no_preload: bool = False, no_filter: bool = False) -> List[Any]:
+def _resolve_symbols(imported: Dict[str, str], candidates: List[Tuple[Tuple[frozenset, frozenset, frozenset], Dict[str, str]]]) -> Tuple[List[Tuple[int, str, str]], Set[str]]:
+    best_candidate, pending = {}, set(imported)
+    for priority, (index, (classified, exported)) in product(range(3), enumerate(candidates)):
+        found = classified[priority] & pending
+        for symbol in found:
+            best_candidate[symbol] = (index, exported[symbol])
+        pending -= found
+        if not pending:
+            break  # every symbol has been resolved already
+    return sorted((index, symbol, type[-1]) for symbol, (index, type) in best_candidate.items()), pending
+
+def _eradicate_types(results: List[Any]) -> List[Any]:
+    for result in results:
+        depslist = result[_KEY_DEPENDENCIES]
+        stripped = [ { **library, _KEY_SYMBOLS: [ name for name, _ in library[_KEY_SYMBOLS] ] } for library in (depslist if isinstance(depslist, list) else [depslist]) ]
+        result[_KEY_DEPENDENCIES] = stripped if isinstance(depslist, list) else stripped[0]
+    return results
+
+def _process_file_cached(filename: str, ignore_weak: bool, cache: Dict[Tuple[str, str], Any], preloaded: Optional[Dict[str, str]] = None, executor: Optional[Executor] = None, keep_imports: bool = False) -> Optional[List[Dict]]:
+    cache_key = (filename, ignore_weak, tuple(preloaded.items()) if preloaded else None)
+    return _lazy_compute(cache, 'res', cache_key, lambda _key: process_file_recursive(filename, ignore_weak, cache, preloaded, executor, keep_imports))
+
+def process_file(filename: str, cache: Dict[Tuple[str, str], Any] = {}, recursive: bool = False, print_types: bool = False, no_preload: bool = False, no_filter: bool = False, strict: bool = False, executors: Optional[Tuple[Executor, Executor]] = None) -> List[Any]:
     # Normalize file name
-    filename = realpath(normpath(filename))
+    filename = _canonical_path(cache, filename)
     if not (isfile(filename) and os.access(filename, os.R_OK)):
         raise OSError(f"Input file \"{filename}\" not found or access denied!")
 
     # Check file type
-    if not _detect_executable(filename):
+    if not _lazy_compute_all(cache, 'elf-strict' if strict else 'elf', [filename], _detect_executable_file if strict else _detect_executable)[0]:
         raise ValueError(f"Input file \"{filename}\" is not a supported executable file or shared library!")
 
-    # Create queue
-    results, files_visited, pending_files, = [], { filename }, deque({ (filename, None) })
+    # Non-recursive mode: analyze the given file only, without queue or thread pools
+    if not recursive:
+        result = _process_file_cached(filename, not no_filter, cache)
+        results = [ { _KEY_FILENAME: filename, _KEY_DEPENDENCIES: result[0] if len(result) == 1 else result } ] if result else []
+        return results if print_types else _eradicate_types(results)
 
-    # Process all pending files
-    while True:
-        try:
-            filename, preloaded = pending_files.popleft()
-        except IndexError:
-            break
-        result = process_file_recursive(filename, not no_filter, cache, preloaded)
-        if result:
-            results.append({ _KEY_FILENAME: filename, _KEY_DEPENDENCIES: result[0] if len(result) == 1 else result })
-            if recursive:
-                preloaded = _merge_dict(preloaded, { _library[_KEY_SONAME]: _library[_KEY_PATH] for _library in result if _KEY_PATH in _library }) if not no_preload else None
-                for path in [ _path for _path in [ library[_KEY_PATH] for library in result if _KEY_PATH in library ] if _path not in files_visited ]:
-                    files_visited.add(path)
-                    pending_files.append((path, preloaded))
-
-    # Eradicate symbol types, if requested
-    if not print_types:
-        for result in results:
-            depslist = result[_KEY_DEPENDENCIES]
-            for library in depslist if isinstance(depslist, list) else [depslist]:
-                library[_KEY_SYMBOLS] = [ symbol[_KEY_NAME] for symbol in library[_KEY_SYMBOLS] ]
+    # Recursive mode: process all dependencies, using the given thread pools or new ones
+    if executors:
+        results = _process_queue(filename, cache, no_preload, no_filter, *executors)
+    else:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as file_executor, ThreadPoolExecutor(max_workers=os.cpu_count()) as library_executor:
+            results = _process_queue(filename, cache, no_preload, no_filter, file_executor, library_executor)
+
+    return results if print_types else _eradicate_types(results)
+
+def _process_queue(filename: str, cache: Dict[Tuple[str, str], Any], no_preload: bool, no_filter: bool, file_executor: Executor, library_executor: Executor) -> List[Any]:
+    # Create queue
+    results, files_visited, pending_files = [], { filename }, deque([(filename, None)])
+
+    # Process all pending files, one "generation" at a time (concurrently)
+    while pending_files:
+        generation = [ pending_files.popleft() for _ in range(len(pending_files)) ]
+        for (filename, preloaded), result in zip(generation, file_executor.map(lambda _item: _process_file_cached(_item[0], not no_filter, cache, _item[1], library_executor, True), generation)):
+            if result:
+                results.append({ _KEY_FILENAME: filename, _KEY_DEPENDENCIES: result[0] if len(result) == 1 else result })
+                libraries = { _library[_KEY_SONAME]: _library[_KEY_PATH] for _library in result if _KEY_PATH in _library }
+                preloaded = _merge_dict(preloaded, libraries) if not no_preload else None
+                for path in libraries.values():
+                    if path not in files_visited:
+                        files_visited.add(path)
+                        pending_files.append((path, preloaded))
 
     return results
 
@@ -235,10 +892,25 @@ def process_file(filename: str, cache: Dict[str, Any] = {}, recursive: bool = Fa
 # Output
 # ============================================================================
 
+def _has_types(library: Dict[str, Any]) -> bool:
+    symbols = library[_KEY_SYMBOLS]
+    return (len(symbols) > 0) and isinstance(symbols[0], tuple)
+
+def _expand_symbols(result: Dict[str, Any]) -> Dict[str, Any]:
+    depslist = result[_KEY_DEPENDENCIES]
+    expanded = [ { **library, _KEY_SYMBOLS: [ { _KEY_NAME: name, _KEY_TYPE: type } for name, type in library[_KEY_SYMBOLS] ] } if _has_types(library) else library for library in (depslist if isinstance(depslist, list) else [depslist]) ]
+    return { **result, _KEY_DEPENDENCIES: expanded if isinstance(depslist, list) else expanded[0] }
+
 def print_results(results: List[Any], json_format: bool = False, indent: int = 3):
     # Output the final results
     if json_format:
-        json.dump(results[0] if len(results) == 1 else results, sys.stdout, indent=(indent if indent > 0 else None))
+        results = [ _expand_symbols(result) for result in results ]
+        data = results[0] if len(results) == 1 else results
+        encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2) if orjson and (indent == 2) else None
+        if encoded and encoded.isascii():
+            sys.stdout.write(encoded.decode('ascii'))  # same layout as the "json" module, but encoded in a single pass
+        else:
+            sys.stdout.write(json.dumps(data, indent=(indent if indent > 0 else None)))
         print(file=sys.stdout)
     else:
         indent_chars = ('\x20' * indent, '\x20' * (2 * indent)) if indent > 0 else ('\t', '\t\t')
@@ -248,10 +920,28 @@ def print_results(results: List[Any], json_format: bool = False, indent: int = 3
             for library in depslist if isinstance(depslist, list) else [depslist]:
                 imported_symbols = library[_KEY_SYMBOLS]
                 print(f"{indent_chars[0]}{library[_KEY_SONAME]} => {library[_KEY_PATH]}" if library[_KEY_SONAME] else f"{indent_chars[0]}unresolved symbols:")
-                for symbol in imported_symbols:
-                    print(f"{indent_chars[1]}{symbol[_KEY_NAME]} [{symbol[_KEY_TYPE]}]" if isinstance(symbol, dict) else f"{indent_chars[1]}{symbol}")
+                if _has_types(library):
+                    for name, type in imported_symbols:
+                        print(f"{indent_chars[1]}{name} [{type}]")
+                else:
+                    for name in imported_symbols:
+                        print(f"{indent_chars[1]}{name}")
         print()
 
+def _report_results(filenames: List[str], pending_results: List[Callable[[], List[Any]]], args: argparse.Namespace) -> int:
+    for filename, get_results in zip(filenames, pending_results):
+        try:
+            results = get_results()
+            if results:
+                print_results(results, args.json_format, args.indent)
+            else:
+                print(f"No dependencies for \"{filename}\" have been found!", file=sys.stderr)
+        except Exception as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            if not args.keep_going:
+                return 1
+    return 0
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -263,7 +953,7 @@ def main() -> int:
         return 1
 
     # Check operating system
-    if not re.search(r'^(linux|(free|open|net)bsd)|sunos', sys.platform, re.A | re.I):
+    if not _RE_PLATFORM.search(sys.platform):
         print(f"Dependencies.py: Sorry, this script must run on the Linux or *BSD platform! [{sys.platform}]", file=sys.stderr)
         return 1
 
@@ -282,33 +972,45 @@ def main() -> int:
     parser.add_argument('--no-filter', action='store_true', default=False, help="Do not ignore \"weak\" unresolved symbols")
     parser.add_argument('--keep-going', action='store_true', default=False, help="Keep going, even when an error is encountered")
     parser.add_argument('--indent', type=int, default=3, help="Set number of spaces to use for indentation (default: 3)")
+    parser.add_argument('--cache', action='store_true', default=False, help="Same as --cache-dir, but use the default location under $XDG_CACHE_HOME")
+    parser.add_argument('--cache-dir', metavar='PATH', help="Keep the symbol tables of analyzed files in a persistent cache directory")
+    parser.add_argument('--strict', action='store_true', default=False, help="Use the \"file\" program to detect the type of the input files")
 
     # Parse arguments
     args = parser.parse_args()
 
     # Check required tool
-    for tool in ['file', 'ldd', 'nm']:
+    for tool in (['file'] if args.strict else []) + ['ldd', 'nm']:
         if not os.access(f'/usr/bin/{tool}', os.R_OK | os.X_OK):
             print(f"Required tool \"/usr/bin/{tool}\" is not available or inaccessible!", file=sys.stderr)
             return 1
 
     # Initialize the cache
-    cache = {}
+    cache_dir = args.cache_dir or (_default_cache_dir() if args.cache else None)
+    cache = _PersistentCache(cache_dir) if cache_dir else {}
 
-    # Process all given input files
-    for filename in args.input:
+    try:
+        # Check the file types of all input files at once
         try:
-            results = process_file(filename, cache, args.recursive, args.print_types, args.no_preload, args.no_filter)
-            if results:
-                print_results(results, args.json_format, args.indent)
-            else:
-                print(f"No dependencies for \"{filename}\" have been found!", file=sys.stderr)
-        except Exception as e:
-            print(f"Error: {str(e)}", file=sys.stderr)
-            if not args.keep_going:
-                return 1
-
-    return 0
+            _lazy_compute_all(cache, 'elf-strict' if args.strict else 'elf', [ _canonical_path(cache, filename) for filename in args.input ], _detect_executable_file if args.strict else _detect_executable)
+        except Exception:
+            pass  # the error is reported for each affected file below
+
+        # Process a single input file directly, without any thread pools
+        if (len(args.input) < 2) and (not args.recursive):
+            return _report_results(args.input, [ lambda: process_file(args.input[0], cache, args.recursive, args.print_types, args.no_preload, args.no_filter, args.strict) ], args)
+
+        # Process all given input files (concurrently, but the results are printed in the original order)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as input_executor, ThreadPoolExecutor(max_workers=os.cpu_count()) as file_executor, ThreadPoolExecutor(max_workers=os.cpu_count()) as library_executor:
+            futures = [ input_executor.submit(process_file, filename, cache, args.recursive, args.print_types, args.no_preload, args.no_filter, args.strict, (file_executor, library_executor)) for filename in args.input ]
+            exit_code = _report_results(args.input, [ _future.result for _future in futures ], args)
+            for _future in futures:
+                _future.cancel()
+            return exit_code
+    finally:
+        # Save the cache
+        if cache_dir:
+            cache.save()
 
 if __name__ == '__main__':
     sys.exit(main())